@@ -1,16 +1,40 @@
 #!/usr/bin/env python3
 
+import io
 import os
 import re
+import json
+import hashlib
 import argparse
-import requests
+import asyncio
+import queue
 import threading
+import multiprocessing
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import aiohttp
+import aiofiles
 from time import sleep
 from urllib.parse import urlparse
 from bs4 import BeautifulSoup
+from selectolax.lexbor import LexborHTMLParser
 import img2pdf
-from PIL import Image
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from PIL import Image, ImageOps
+
+try:  # optional: streaming, lower-memory transcoding via libvips
+    import pyvips
+except (ImportError, OSError):
+    pyvips = None
+else:
+    # each image is read once; rely on the OS file cache instead
+    pyvips.cache_set_max(0)
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
 
 # --- Rich styling ---
 from rich.console import Console
@@ -42,49 +66,81 @@ console = Console(
 # -------------------------
 # Rich Setup
 # -------------------------
+_BYTE_UNITS = ("B", "KB", "MB", "GB", "TB")
+
+
 def _human_bytes(n: float) -> str:
-    units = ["B", "KB", "MB", "GB", "TB"]
-    i = 0
-    while n >= 1024 and i < len(units) - 1:
-        n /= 1024.0
-        i += 1
-    return f"{int(n)} {units[i]}" if i == 0 else f"{n:.1f} {units[i]}"
+    n = int(n)
+    # unit index straight from the bit length: 1 KB = 2**10, 1 MB = 2**20, ...
+    i = min((n.bit_length() - 1) // 10, 4) if n >= 1024 else 0
+    if i == 0:
+        return f"{n} B"
+    return f"{n / (1 << (i * 10)):.1f} {_BYTE_UNITS[i]}"
 
 
 class ByteSizeColumn(ProgressColumn):
     """Render completed / total in human-readable bytes."""
 
+    _key = None
+    _text = None
+
     def render(self, task) -> Text:
-        completed = _human_bytes(task.completed or 0)
-        if task.total is not None:
-            total = _human_bytes(task.total)
-            return Text(f"{completed}/{total}")
-        return Text(completed)
+        # Rich re-renders on every refresh; skip formatting if nothing moved
+        key = (task.completed, task.total)
+        if key != self._key:
+            completed = _human_bytes(task.completed or 0)
+            if task.total is not None:
+                total = _human_bytes(task.total)
+                self._text = Text(f"{completed}/{total}")
+            else:
+                self._text = Text(completed)
+            self._key = key
+        return self._text
 
 
 class SpeedColumn(ProgressColumn):
     """Render transfer speed in human-readable bytes per second."""
 
+    _key = None
+    _text = None
+
     def render(self, task) -> Text:
-        spd = task.speed or 0.0
-        return Text(f"{_human_bytes(spd)}/s")
+        key = int(task.speed or 0)
+        if key != self._key:
+            self._text = Text(f"{_human_bytes(key)}/s")
+            self._key = key
+        return self._text
 
 
 # -------------------------
 # Networking helpers
 # -------------------------
-def make_session():
+USER_AGENT = (
+    "Mozilla/5.0 (X11; Linux x86_64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/124.0 Safari/537.36"
+)
+
+
+def make_session(pool_connections=32, pool_maxsize=64):
     s = requests.Session()
-    s.headers.update(
-        {
-            "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) "
-            "AppleWebKit/537.36 (KHTML, like Gecko) "
-            "Chrome/124.0 Safari/537.36"
-        }
+    s.headers.update({"User-Agent": USER_AGENT})
+    # get_with_retries does its own retries
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=Retry(total=0),
     )
+    s.mount("http://", adapter)
+    s.mount("https://", adapter)
     return s
 
 
+# One process-wide session so every caller shares the same keep-alive pool
+# and TLS session cache. Safe for concurrent GETs; nothing mutates its config.
+SESSION = make_session()
+
+
 def get_with_retries(session, url, *, retries=3, timeout=20):
     last_err = None
     for attempt in range(1, retries + 1):
@@ -98,22 +154,12 @@ def get_with_retries(session, url, *, retries=3, timeout=20):
     raise last_err
 
 
-# thread-local sessions (requests.Session is not guaranteed thread-safe)
-_thread_local = threading.local()
-
-
-def thread_session():
-    sess = getattr(_thread_local, "session", None)
-    if sess is None:
-        sess = make_session()
-        _thread_local.session = sess
-    return sess
-
-
 # -------------------------
 # Series helpers
 # -------------------------
 SAFE_NAME_RE = re.compile(r"[^A-Za-z0-9 _-]+")
+_IMG_EXTS = (".jpg", ".jpeg", ".png", ".webp")
+IMAGE_EXTS = frozenset(_IMG_EXTS)
 
 
 def sanitize_name(s):
@@ -133,15 +179,20 @@ def ensure_series_dirs(root):
     os.makedirs(os.path.join(root, "Chapters"), exist_ok=True)
 
 
+CHAPTER_LABEL_RE = re.compile(
+    r"(?:^|/)(?:chapter|chap|ch)[-_/]?(\d+)(?:/|$)", re.IGNORECASE
+)
+
+
 def chapter_label_from_url(chapter_url):
-    m = re.search(
-        r"(?:^|/)(?:chapter|chap|ch)[-_/]?(\d+)(?:/|$)",
-        chapter_url,
-        flags=re.IGNORECASE,
-    )
+    m = CHAPTER_LABEL_RE.search(chapter_url)
     return m.group(1) if m else None
 
 
+def series_cache_dir(root):
+    return os.path.join(root, ".cache")
+
+
 def chapter_dir(root, label):
     return os.path.join(root, "Images", f"chapter-{label}")
 
@@ -150,18 +201,31 @@ def chapter_pdf(root, label):
     return os.path.join(root, "Chapters", f"chapter-{label}.pdf")
 
 
+def existing_pdfs(root):
+    try:
+        with os.scandir(os.path.join(root, "Chapters")) as it:
+            return {e.name for e in it if e.name.endswith(".pdf")}
+    except FileNotFoundError:
+        return set()
+
+
 # -------------------------
 # Scraping / parsing
 # -------------------------
-def get_total_chapters(session, url):
-    try:
-        with console.status(f"[info]Fetching series page[/info] {url}"):
-            response = get_with_retries(session, url)
-    except requests.RequestException as e:
-        console.print(f"[err]Error fetching page:[/err] {e}")
-        return None
+def _parse_total_chapters(html):
+    tree = LexborHTMLParser(html)
+    for div in tree.css("div.flex.justify-between"):
+        spans = div.css("span")
+        if len(spans) >= 2 and "Total chapters" in spans[0].text(strip=True):
+            try:
+                return int(spans[1].text(strip=True))
+            except ValueError:
+                pass
+    return None
+
 
-    soup = BeautifulSoup(response.text, "html.parser")
+def _parse_total_chapters_bs4(html):
+    soup = BeautifulSoup(html, "html.parser")
     for div in soup.find_all("div", class_="flex justify-between"):
         spans = div.find_all("span")
         if len(spans) >= 2 and "Total chapters" in spans[0].get_text(strip=True):
@@ -172,12 +236,85 @@ def get_total_chapters(session, url):
     return None
 
 
+def _absolute_image_urls(srcs):
+    # ✅ ONLY accept absolute http(s) URLs; skip paths like /icon.png or images/001.jpg
+    return [s for s in srcs if s and s.lower().startswith(("http://", "https://"))]
+
+
+def _parse_chapter_images(html):
+    """Return absolute image URLs from div#content, or None if the div is missing."""
+    content = LexborHTMLParser(html).css_first("div#content")
+    if content is None:
+        return None
+    return _absolute_image_urls(
+        (n.attributes.get("data-src") or n.attributes.get("src") or "").strip()
+        for n in content.css("img")
+    )
+
+
+def _parse_chapter_images_bs4(html):
+    soup = BeautifulSoup(html, "html.parser")
+    content_div = soup.find("div", id="content")
+    if not content_div:
+        return None
+    return _absolute_image_urls(
+        (img.get("data-src") or img.get("src") or "").strip()
+        for img in content_div.find_all("img")
+    )
+
+
+def get_total_chapters(session, url):
+    try:
+        with console.status(f"[info]Fetching series page[/info] {url}"):
+            response = get_with_retries(session, url)
+    except requests.RequestException as e:
+        console.print(f"[err]Error fetching page:[/err] {e}")
+        return None
+
+    try:
+        return _parse_total_chapters(response.text)
+    except Exception:
+        return _parse_total_chapters_bs4(response.text)
+
+
 def generate_chapter_urls(base_url, total_chapters):
     base = base_url.rstrip("/")
     return [f"{base}/chapter-{i}" for i in range(1, total_chapters + 1)]
 
 
-def extract_chapter_images(session, chapter_url):
+def _image_list_cache_path(cache_dir, chapter_url):
+    digest = hashlib.sha1(chapter_url.encode("utf-8")).hexdigest()
+    return os.path.join(cache_dir, f"{digest}.json")
+
+
+def _load_image_list(cache_dir, chapter_url):
+    try:
+        with open(_image_list_cache_path(cache_dir, chapter_url), encoding="utf-8") as f:
+            image_urls = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return image_urls if isinstance(image_urls, list) else None
+
+
+def _store_image_list(cache_dir, chapter_url, image_urls):
+    path = _image_list_cache_path(cache_dir, chapter_url)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        # write-then-rename so an interrupted run never leaves a torn file
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(image_urls, f)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+def extract_chapter_images(session, chapter_url, cache_dir=None):
+    """Fetch a chapter page and return its image URLs.
+
+    With ``cache_dir``, a non-empty result is also saved there so a resumed
+    run can reuse it (see download_chapter).
+    """
     try:
         with console.status(f"[info]Loading chapter[/info] {chapter_url}"):
             response = get_with_retries(session, chapter_url)
@@ -185,26 +322,25 @@ def extract_chapter_images(session, chapter_url):
         console.print(f"[err]Error fetching chapter:[/err] {e}")
         return []
 
-    soup = BeautifulSoup(response.text, "html.parser")
-    content_div = soup.find("div", id="content")
-    if not content_div:
+    try:
+        image_urls = _parse_chapter_images(response.text)
+    except Exception:
+        image_urls = _parse_chapter_images_bs4(response.text)
+    if image_urls is None:
         console.print(f"[warn]No content div found:[/warn] {chapter_url}")
         return []
-
-    image_urls = []
-    for img in content_div.find_all("img"):
-        src = (img.get("data-src") or img.get("src") or "").strip()
-        if not src:
-            continue
-        # ✅ ONLY accept absolute http(s) URLs; skip paths like /icon.png or images/001.jpg
-        if src.lower().startswith(("http://", "https://")):
-            image_urls.append(src)
+    if cache_dir and image_urls:
+        _store_image_list(cache_dir, chapter_url, image_urls)
     return image_urls
 
 
 # -------------------------
 # PDF layout
 # -------------------------
+# Pages are 720pt (10 in) wide; at 96 dpi that is 960px of useful raster.
+PAGE_WIDTH_PX = 960
+
+
 def layout_fun_fixed_width(imgwidthpx, imgheightpx, ndpi):
     page_width_pt = 720  # 10 inches
     dpi_x = ndpi[0] if ndpi and ndpi[0] and ndpi[0] > 0 else 96
@@ -218,83 +354,265 @@ def layout_fun_fixed_width(imgwidthpx, imgheightpx, ndpi):
     return page_width_pt, scaled_h_pt, page_width_pt, scaled_h_pt
 
 
-def images_to_pdf(image_folder, output_pdf):
-    src_files = sorted(
-        os.path.join(image_folder, f)
-        for f in os.listdir(image_folder)
-        if f.lower().endswith((".jpg", ".jpeg", ".png", ".webp"))
+def _has_alpha(im):
+    return im.mode in ("RGBA", "LA", "PA") or (
+        im.mode == "P" and "transparency" in im.info
+    )
+
+
+def _pil_jpeg_bytes(im, icc_profile=None):
+    buf = io.BytesIO()
+    im.save(
+        buf,
+        format="JPEG",
+        quality=95,
+        subsampling=0,
+        optimize=False,
+        icc_profile=icc_profile,
     )
+    return buf.getvalue()
+
+
+def _pil_pdf_ready_image(p, ext):
+    with Image.open(p) as im:
+        alpha = _has_alpha(im)
+        # opaque PNGs are embedded as-is; only WEBP and alpha PNGs need work
+        if ext == ".png" and not alpha:
+            return p
+        if alpha:
+            rgba = im.convert("RGBA")
+            bg = Image.new("RGB", im.size, (255, 255, 255))
+            bg.paste(rgba, mask=rgba.getchannel("A"))
+            im = bg
+        else:
+            im = im.convert("RGB")
+        return _pil_jpeg_bytes(im)
+
+
+def _vips_pdf_ready_image(p, ext):
+    # sequential access streams the image in strips instead of decoding it whole
+    img = pyvips.Image.new_from_file(p, access="sequential")
+    if ext == ".png" and not img.hasalpha():
+        return p
+    # 8-bit sRGB first, so the white background below is 3 bands of 255
+    # even for grey+alpha or 16-bit sources
+    img = img.colourspace("srgb")
+    if img.hasalpha():
+        img = img.flatten(background=[255, 255, 255])
+    return img.write_to_buffer(".jpg", Q=95, strip=True)
+
+
+def _pil_shrink_jpeg(p):
+    with Image.open(p) as im:
+        # CMYK/YCCK pages would need colour management to re-encode as RGB
+        if im.format != "JPEG" or im.mode not in ("RGB", "L"):
+            return p
+        w, h = im.size
+        # orientations 5-8 are rotated by 90 degrees: the page width is h
+        rotated = im.getexif().get(0x0112, 1) in (5, 6, 7, 8)
+        page_w, page_h = (h, w) if rotated else (w, h)
+        # draft() only scales by 1/2, 1/4 or 1/8, so anything narrower than
+        # twice the page width is embedded untouched
+        if page_w < 2 * PAGE_WIDTH_PX:
+            return p
+        # DCT-domain downscale while decoding; never below PAGE_WIDTH_PX
+        target = (PAGE_WIDTH_PX, PAGE_WIDTH_PX * page_h // page_w)
+        im.draft(im.mode, target[::-1] if rotated else target)
+        icc_profile = im.info.get("icc_profile")
+        # img2pdf would have honoured the EXIF orientation; bake it in instead
+        im = ImageOps.exif_transpose(im)
+        return _pil_jpeg_bytes(im, icc_profile=icc_profile)
+
+
+def _pdf_ready_image(p):
+    """Return what img2pdf should embed for ``p``, or None if it can't be read.
+
+    That is the path itself when the file can be embedded untouched, or the
+    transcoded JPEG as in-memory bytes.
+    """
+    ext = os.path.splitext(p)[1].lower()
+    try:
+        if ext in (".jpg", ".jpeg"):
+            return _pil_shrink_jpeg(p)
+        if pyvips is not None:
+            return _vips_pdf_ready_image(p, ext)
+        return _pil_pdf_ready_image(p, ext)
+    except Exception:
+        return None
+
+
+def _render_pdf(image_folder, output_pdf, threads=None):
+    """Build ``output_pdf`` without touching the console.
+
+    Returns None on success, otherwise the reason the PDF was skipped. Kept
+    free of console output so it can run inside a worker process; ``threads``
+    caps its conversion pool (default: one per CPU).
+    """
+    # names are zero-padded (001.jpg, 002.png, ...) so path order is page order
+    with os.scandir(image_folder) as it:
+        src_files = sorted(
+            e.path for e in it if e.is_file() and e.name.lower().endswith(_IMG_EXTS)
+        )
     if not src_files:
-        console.print(f"[warn]No images in[/warn] {image_folder} — skipping PDF.")
-        return False
-    convert_dir = os.path.join(image_folder, "_converted")
-    os.makedirs(convert_dir, exist_ok=True)
-    out_files = []
-    for p in src_files:
-        ext = os.path.splitext(p)[1].lower()
-        if ext in (".jpg", ".jpeg", ".png"):
-            out_files.append(p)
-            continue
-        try:
-            with Image.open(p) as im:
-                if im.mode in ("RGBA", "LA"):
-                    bg = Image.new("RGB", im.size, (255, 255, 255))
-                    bg.paste(im.convert("RGBA"), mask=im.getchannel("A"))
-                    im = bg
-                else:
-                    im = im.convert("RGB")
-                base = os.path.splitext(os.path.basename(p))[0]
-                dest = os.path.join(convert_dir, base + ".jpg")
-                im.save(dest, format="JPEG", quality=95)
-                out_files.append(dest)
-        except Exception:
-            continue
+        return "No images in"
+    # PIL and libvips both release the GIL, so conversions scale across threads
+    with ThreadPoolExecutor(max_workers=threads or os.cpu_count()) as pool:
+        out_files = [p for p in pool.map(_pdf_ready_image, src_files) if p]
     if not out_files:
-        console.print(f"[warn]No convertible images in[/warn] {image_folder} — skipping PDF.")
-        return False
-    with console.status(f"[info]Building PDF[/info] → {output_pdf}"):
-        with open(output_pdf, "wb") as f:
-            f.write(
-                img2pdf.convert(
-                    out_files,
-                    layout_fun=layout_fun_fixed_width,
-                    x=None,
-                    y=None,
-                    border=0,
-                    fit=None,
-                )
+        return "No convertible images in"
+    with open(output_pdf, "wb") as f:
+        f.write(
+            img2pdf.convert(
+                out_files,
+                layout_fun=layout_fun_fixed_width,
+                x=None,
+                y=None,
+                border=0,
+                fit=None,
             )
+        )
+    return None
+
+
+def _report_pdf(image_folder, output_pdf, skipped):
+    if skipped:
+        console.print(f"[warn]{skipped}[/warn] {image_folder} — skipping PDF.")
+        return False
     console.print(f"[ok]PDF saved[/ok] {output_pdf}")
     return True
 
 
+def images_to_pdf(image_folder, output_pdf):
+    with console.status(f"[info]Building PDF[/info] → {output_pdf}"):
+        skipped = _render_pdf(image_folder, output_pdf)
+    return _report_pdf(image_folder, output_pdf, skipped)
+
+
 # -------------------------
-# Multithreaded download utils
+# Async download utils
 # -------------------------
-def _is_valid_image_url(u: str) -> bool:
-    parsed = urlparse(u)
-    if parsed.scheme.lower() not in ("http", "https"):
-        return False
+COPY_BUFSIZE = 1024 * 1024
+
+
+def _url_path_ext(u: str) -> str:
+    """Lower-cased extension of the URL's path, ignoring query and fragment."""
+    end = len(u)
+    for sep in ("?", "#"):
+        j = u.find(sep)
+        if j != -1 and j < end:
+            end = j
+    start = u.find("/", u.find("://") + 3, end)
+    if start == -1:
+        return ""
+    dot = u.rfind(".", start, end)
+    if dot == -1 or u.find("/", dot, end) != -1:
+        return ""
+    return u[dot:end].lower()
+
+
+def _image_url_ext(u: str):
+    """Path extension of an http(s) image URL, or None if it should be skipped."""
+    if not u[:8].lower().startswith(("http://", "https://")):
+        return None
+    ext = _url_path_ext(u)
     # optional: ignore obvious non-page assets
-    if parsed.path.lower().endswith((".svg", ".ico")):
-        return False
-    return True
+    if ext in (".svg", ".ico"):
+        return None
+    return ext
 
 
-def _head_content_length(url: str, timeout=10) -> int:
-    if not _is_valid_image_url(url):
-        return 0
-    sess = thread_session()
-    try:
-        r = sess.head(url, allow_redirects=True, timeout=timeout)
-        cl = r.headers.get("content-length")
-        return int(cl) if cl and cl.isdigit() else 0
-    except Exception:
-        return 0
+def _grow_total(progress, task_id, n):
+    total = progress.tasks[task_id].total or 0
+    progress.update(task_id, total=total + n)
+
+
+async def _download_one(session, sem, job, progress, task_id, max_retries):
+    i, url, dest = job
+    written = 0
+    sized = 0
+    last_err = None
+    for attempt in range(1, max_retries + 1):
+        written = 0
+        try:
+            async with sem, session.get(url) as resp:
+                resp.raise_for_status()
+                # size comes from the GET itself; no separate HEAD round-trip.
+                # Count it once per image, however many attempts it takes.
+                cl = resp.headers.get("content-length")
+                if not sized and cl and cl.isdigit():
+                    sized = int(cl)
+                    _grow_total(progress, task_id, sized)
+                # coalesce network chunks so each file write / progress tick
+                # covers up to COPY_BUFSIZE bytes instead of one per packet
+                buf = bytearray()
+                async with aiofiles.open(dest, "wb", buffering=COPY_BUFSIZE) as f:
+                    async for chunk in resp.content.iter_any():
+                        buf += chunk
+                        if len(buf) >= COPY_BUFSIZE:
+                            await f.write(buf)
+                            written += len(buf)
+                            progress.advance(task_id, len(buf))
+                            buf.clear()
+                    if buf:
+                        await f.write(buf)
+                        written += len(buf)
+                        progress.advance(task_id, len(buf))
+            if not sized:
+                # no Content-Length: account for the bytes once they're known
+                _grow_total(progress, task_id, written)
+            return (i, dest, True, written, None, None)
+        except Exception as e:
+            last_err = e
+            if written:
+                # the next attempt rewrites the file from scratch
+                progress.advance(task_id, -written)
+            await asyncio.sleep(0.6 * attempt)
+    if sized:
+        # never arriving, so take it back out of the total
+        _grow_total(progress, task_id, -sized)
+    return (
+        i,
+        dest,
+        False,
+        written,
+        str(last_err) or type(last_err).__name__,
+        getattr(last_err, "status", None),
+    )
+
+
+async def _download_all(jobs, workers, max_retries, timeout, progress, task_id):
+    connector = aiohttp.TCPConnector(
+        limit=workers,
+        limit_per_host=workers,
+        ttl_dns_cache=300,
+        keepalive_timeout=30,
+    )
+    sem = asyncio.Semaphore(workers)
+    async with aiohttp.ClientSession(
+        connector=connector,
+        # like the requests (connect, read) timeout: bounds stalls, not the
+        # total transfer time, so large pages on slow links still finish
+        timeout=aiohttp.ClientTimeout(
+            total=None, sock_connect=timeout, sock_read=timeout
+        ),
+        headers={"User-Agent": USER_AGENT},
+    ) as session:
+        return await asyncio.gather(
+            *(
+                _download_one(session, sem, j, progress, task_id, max_retries)
+                for j in jobs
+            )
+        )
 
 
 def download_images_threaded(
-    image_urls, out_dir, workers=6, max_retries=3, timeout=40, verbose=False
+    image_urls,
+    out_dir,
+    workers=6,
+    max_retries=3,
+    timeout=40,
+    verbose=False,
+    only=None,
 ):
     os.makedirs(out_dir, exist_ok=True)
 
@@ -302,12 +620,13 @@ def download_images_threaded(
     jobs = []
     idx = 0
     for u in image_urls:
-        if not _is_valid_image_url(u):
+        ext = _image_url_ext(u)
+        if ext is None:
             continue
         idx += 1
-        parsed = urlparse(u)
-        ext = os.path.splitext(parsed.path)[1].lower()
-        if ext not in [".jpg", ".jpeg", ".png", ".webp"]:
+        if only is not None and idx not in only:
+            continue
+        if ext not in IMAGE_EXTS:
             ext = ".jpg"
         filename = f"{idx:03d}{ext}"
         dest = os.path.join(out_dir, filename)
@@ -318,15 +637,8 @@ def download_images_threaded(
         url_list = "\n".join(f"{i:03d}  {u}" for i, u, _ in jobs)
         console.print(Panel.fit(url_list, title="Images (extracted)", style="info"))
 
-    # Estimate total size concurrently for proper KB/MB progress
-    total_est = 0
-    with ThreadPoolExecutor(max_workers=workers) as pool:
-        for size in pool.map(_head_content_length, (u for _, u, _ in jobs)):
-            total_est += size
-
-    results = []  # collect (idx, dest, ok, bytes, error)
-
-    # Progress bar tracks bytes, with human-readable units
+    # Progress bar tracks bytes, with human-readable units; the total grows
+    # as each GET reports its Content-Length
     with Progress(
         TextColumn("[bold]Downloading[/bold]"),
         BarColumn(),
@@ -335,38 +647,11 @@ def download_images_threaded(
         TimeRemainingColumn(),
         console=console,
     ) as progress:
-        task_id = progress.add_task("dl", total=total_est or None)
-
-        def _wrap_download(j):
-            i, url, dest = j
-            ok = False
-            written = 0
-            err = None
-            sess = thread_session()
-            last_err = None
-            for attempt in range(1, max_retries + 1):
-                try:
-                    resp = get_with_retries(sess, url, retries=1, timeout=timeout)
-                    with open(dest, "wb") as f:
-                        for chunk in resp.iter_content(chunk_size=32768):
-                            if not chunk:
-                                continue
-                            f.write(chunk)
-                            written += len(chunk)
-                            progress.advance(task_id, len(chunk))
-                    ok = True
-                    break
-                except Exception as e:
-                    last_err = e
-                    sleep(0.6 * attempt)
-            if not ok:
-                err = str(last_err)
-            return (i, dest, ok, written, err)
-
-        with ThreadPoolExecutor(max_workers=workers) as pool:
-            futures = [pool.submit(_wrap_download, j) for j in jobs]
-            for fut in as_completed(futures):
-                results.append(fut.result())
+        task_id = progress.add_task("dl", total=None)
+        # collect (idx, dest, ok, bytes, error, http status of the failure)
+        results = asyncio.run(
+            _download_all(jobs, workers, max_retries, timeout, progress, task_id)
+        )
 
     # Ordered summary table (only if requested)
     if verbose and results:
@@ -376,7 +661,7 @@ def download_images_threaded(
         table.add_column("Size", justify="right")
         table.add_column("Status", style="ok")
 
-        for i, dest, ok, written, err in sorted(results, key=lambda r: r[0]):
+        for i, dest, ok, written, err, _ in sorted(results, key=lambda r: r[0]):
             size_str = _human_bytes(written) if written else "-"
             status = "OK" if ok else "[err]FAIL[/err]"
             if err and not ok:
@@ -386,11 +671,66 @@ def download_images_threaded(
         console.print(table)
 
     console.print(f"[ok]{len(results)} files processed[/ok] → {out_dir}")
+    return results
 
 
 # -------------------------
 # Workflows
 # -------------------------
+# responses that mean a cached image URL has expired or moved
+STALE_STATUSES = frozenset({403, 404, 410})
+
+
+def download_chapter(
+    session,
+    chapter_url,
+    img_dir,
+    cache_dir,
+    refresh=False,
+    workers=6,
+    max_retries=3,
+    verbose=False,
+):
+    """Extract and download a chapter's images; False if none were found.
+
+    A cached image list is reused without fetching the page. If some of its
+    URLs come back 403/404/410 (signed CDN URLs expire), the page is fetched
+    once more and only those images are retried, if their URLs changed.
+    """
+    cached = None if refresh else _load_image_list(cache_dir, chapter_url)
+    images = cached or extract_chapter_images(session, chapter_url, cache_dir)
+    if not images:
+        return False
+    results = download_images_threaded(
+        images, img_dir, workers=workers, max_retries=max_retries, verbose=verbose
+    )
+    if not cached:
+        return True
+    stale = {r[0]: r[1] for r in results if not r[2] and r[5] in STALE_STATUSES}
+    if not stale:
+        return True
+
+    console.print("[warn]Cached image URLs expired — refetching chapter page[/warn]")
+    fresh = extract_chapter_images(session, chapter_url, cache_dir)
+    if not fresh or fresh == cached:
+        return True
+    # same page layout: retry just the failed pages, otherwise start over
+    only = set(stale) if len(fresh) == len(cached) else None
+    for dest in stale.values():
+        # a partial file may carry an extension the fresh URL doesn't
+        if os.path.exists(dest):
+            os.remove(dest)
+    download_images_threaded(
+        fresh,
+        img_dir,
+        workers=workers,
+        max_retries=max_retries,
+        verbose=verbose,
+        only=only,
+    )
+    return True
+
+
 def run_bulk(
     session,
     series_url,
@@ -420,30 +760,125 @@ def run_bulk(
     console.print(f"[info]Total chapters found:[/info] [title]{total}[/title]")
     chapter_urls = generate_chapter_urls(series_url, total)
 
-    for idx, chapter_url in enumerate(chapter_urls, 1):
-        label = str(idx)
-        pdf_path = chapter_pdf(series_dir, label)
-        if os.path.exists(pdf_path) and not force:
-            console.print(
-                f"⏭️  [warn]Chapter {label} exists[/warn] → {pdf_path} (skipping)"
-            )
-            continue
-
-        console.print(
-            Panel.fit(
-                f"Chapter {label}\n{chapter_url}", title="Processing", style="title"
-            )
+    # Download chapter K+1 while chapter K's PDF is built in a worker process.
+    # The queue bounds how far the downloader can run ahead of PDF building.
+    ready = queue.Queue(maxsize=2)
+    # set by the consumer when it stops reading, so the producer can't block
+    # forever on a full queue
+    stop = threading.Event()
+    pdf_workers = min(4, os.cpu_count() or 1)
+    # split the CPUs between the worker processes' conversion pools
+    pdf_threads = max(1, (os.cpu_count() or 1) // pdf_workers)
+    pending = {}
+    # spawn, not fork: the caller (e.g. the web app) may already run threads,
+    # and forking a threaded process can deadlock the child
+    pool = ProcessPoolExecutor(
+        max_workers=pdf_workers, mp_context=multiprocessing.get_context("spawn")
+    )
+    with ThreadPoolExecutor(max_workers=1) as downloader:
+        producer = downloader.submit(
+            _download_chapters,
+            session,
+            series_dir,
+            chapter_urls,
+            ready,
+            stop,
+            force=force,
+            workers=workers,
+            max_retries=max_retries,
+            verbose=verbose,
         )
-        images = extract_chapter_images(session, chapter_url)
-        if not images:
-            console.print(f"[warn]No images for chapter {label}[/warn]")
-            continue
+        try:
+            while True:
+                job = ready.get()
+                if job is None:
+                    break
+                img_dir, pdf_path = job
+                fut = pool.submit(_render_pdf, img_dir, pdf_path, pdf_threads)
+                pending[fut] = job
+                if len(pending) >= pdf_workers:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    _collect_pdfs(pending, done)
+            _collect_pdfs(pending, list(pending))
+        except BaseException:
+            # drop queued builds (cancel_futures needs 3.9; we support 3.8)
+            for fut in pending:
+                fut.cancel()
+            raise
+        finally:
+            stop.set()
+            pool.shutdown(wait=False)
+    # surface any error raised while downloading
+    producer.result()
+
+
+def _put_unless_stopped(ready, item, stop):
+    while not stop.is_set():
+        try:
+            ready.put(item, timeout=0.2)
+            return True
+        except queue.Full:
+            pass
+    return False
 
-        img_dir = chapter_dir(series_dir, label)
-        download_images_threaded(
-            images, img_dir, workers=workers, max_retries=max_retries, verbose=verbose
-        )
-        images_to_pdf(img_dir, pdf_path)
+
+def _download_chapters(
+    session,
+    series_dir,
+    chapter_urls,
+    ready,
+    stop,
+    force,
+    workers,
+    max_retries,
+    verbose,
+):
+    """Producer for run_bulk: download each chapter, then queue it for PDF."""
+    try:
+        # one directory scan instead of a stat() per chapter
+        existing = set() if force else existing_pdfs(series_dir)
+        for idx, chapter_url in enumerate(chapter_urls, 1):
+            if stop.is_set():
+                return
+            label = str(idx)
+            pdf_path = chapter_pdf(series_dir, label)
+            if os.path.basename(pdf_path) in existing:
+                console.print(
+                    f"⏭️  [warn]Chapter {label} exists[/warn] → {pdf_path} (skipping)"
+                )
+                continue
+
+            console.print(
+                Panel.fit(
+                    f"Chapter {label}\n{chapter_url}", title="Processing", style="title"
+                )
+            )
+            img_dir = chapter_dir(series_dir, label)
+            if not download_chapter(
+                session,
+                chapter_url,
+                img_dir,
+                series_cache_dir(series_dir),
+                refresh=force,
+                workers=workers,
+                max_retries=max_retries,
+                verbose=verbose,
+            ):
+                console.print(f"[warn]No images for chapter {label}[/warn]")
+                continue
+            if not _put_unless_stopped(ready, (img_dir, pdf_path), stop):
+                return
+    finally:
+        _put_unless_stopped(ready, None, stop)
+
+
+def _collect_pdfs(pending, done):
+    for fut in done:
+        img_dir, pdf_path = pending.pop(fut)
+        try:
+            _report_pdf(img_dir, pdf_path, fut.result())
+        except Exception as e:
+            console.print(f"[err]PDF failed:[/err] {pdf_path} • {e}")
 
 
 def run_single(
@@ -472,15 +907,20 @@ def run_single(
             f"Single Chapter {label}\n{chapter_url}", title="Processing", style="title"
         )
     )
-    images = extract_chapter_images(session, chapter_url)
-    if not images:
+    img_dir = chapter_dir(series_dir, label)
+    if not download_chapter(
+        session,
+        chapter_url,
+        img_dir,
+        series_cache_dir(series_dir),
+        refresh=force,
+        workers=workers,
+        max_retries=max_retries,
+        verbose=verbose,
+    ):
         console.print("[warn]No images found for this chapter.[/warn]")
         return
 
-    img_dir = chapter_dir(series_dir, label)
-    download_images_threaded(
-        images, img_dir, workers=workers, max_retries=max_retries, verbose=verbose
-    )
     images_to_pdf(img_dir, pdf_path)
 
 
@@ -533,10 +973,9 @@ def parse_args():
 
 def main():
     args = parse_args()
-    session = make_session()
     if args.series_url:
         run_bulk(
-            session,
+            SESSION,
             args.series_url,
             series_name=args.series_name,
             force=args.force,
@@ -546,7 +985,7 @@ def main():
         )
     else:
         run_single(
-            session,
+            SESSION,
             args.chapter_url,
             series_name=args.series_name,
             chapter_num=args.chapter_num,
@@ -558,4 +997,5 @@ def main():
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     main()
@@ -5,7 +5,16 @@ setup(
     version="0.1.0",
     py_modules=["main"],
     python_requires=">=3.8",
-    install_requires=["rich", "requests", "img2pdf", "beautifulsoup4"],
+    install_requires=[
+        "rich",
+        "requests",
+        "aiohttp",
+        "aiofiles",
+        "img2pdf",
+        "beautifulsoup4",
+        "selectolax",
+    ],
+    extras_require={"vips": ["pyvips"]},
     entry_points={
         "console_scripts": [
             "omegadl=main:main",
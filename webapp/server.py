@@ -1,10 +1,13 @@
 import os
 import json
 import sys
+import secrets
 from pathlib import Path
 from flask import Flask, request, send_from_directory, jsonify, Response
 import threading
-import queue
+import time
+from collections import deque
+import multiprocessing
 from contextlib import redirect_stdout, redirect_stderr
 
 ROOT_DIR = Path(__file__).resolve().parents[1]
@@ -20,33 +23,71 @@ from main import (
     ensure_series_dirs,
     chapter_pdf,
     chapter_label_from_url,
-    make_session,
+    SESSION,
 )
 
 app = Flask(__name__, static_folder=str(STATIC_DIR), static_url_path="")
 
 TASKS = {}
+TASKS_LOCK = threading.Lock()
+MAX_LIVE_TASKS = 32
+TASK_TTL_SECS = 300
+SSE_FLUSH_BYTES = 16 * 1024
+SSE_FLUSH_SECS = 0.1
 
-class QueueWriter:
-    def __init__(self, q):
-        self.q = q
+LOG_MAXLEN = 4096
+
+class LogBuffer:
+    """Ring buffer for a task's stdout/stderr, drained by the SSE stream.
+
+    Bounded so a long bulk run with a lagging or disconnected browser keeps
+    at most ``maxlen`` pending writes in memory.
+    """
+    def __init__(self, maxlen=LOG_MAXLEN):
+        self.chunks = deque(maxlen=maxlen)
+        self.cond = threading.Condition()
     def write(self, buf):
         if not buf:
             return
-        try:
-            self.q.put(buf)
-        except Exception:
-            pass
+        with self.cond:
+            # a chunk ending in "\r" is a live repaint about to be overwritten
+            if self.chunks and self.chunks[-1].endswith("\r"):
+                self.chunks[-1] = buf
+            else:
+                self.chunks.append(buf)
+            self.cond.notify_all()
     def flush(self):
         pass
+    def empty(self):
+        return not self.chunks
+    def drain(self, timeout):
+        with self.cond:
+            if not self.chunks:
+                self.cond.wait(timeout)
+            msgs = list(self.chunks)
+            self.chunks.clear()
+        return msgs
+
+def _list_pdfs(pdf_dir):
+    if not os.path.isdir(pdf_dir):
+        return []
+    with os.scandir(pdf_dir) as it:
+        return sorted(e.path for e in it if e.name.lower().endswith(".pdf"))
+
+def _expire_task(task_id):
+    with TASKS_LOCK:
+        TASKS.pop(task_id, None)
 
 def _start_async(data):
-    task_id = f"t{len(TASKS)+1}"
-    q = queue.Queue()
-    TASKS[task_id] = {"queue": q, "done": False, "result": None}
+    log = LogBuffer()
+    task = {"log": log, "done": False, "result": None}
+    with TASKS_LOCK:
+        if sum(1 for t in TASKS.values() if not t["done"]) >= MAX_LIVE_TASKS:
+            return None
+        task_id = secrets.token_urlsafe(9)
+        TASKS[task_id] = task
 
     def _runner():
-        session = make_session()
         mode = data.get("mode")
         series_url = data.get("series_url")
         chapter_url = data.get("chapter_url")
@@ -57,12 +98,12 @@ def _start_async(data):
         max_retries = int(data.get("max_retries", 3))
         verbose = bool(data.get("verbose", False))
 
-        q.put(f"Starting {mode} task\n")
+        log.write(f"Starting {mode} task\n")
         try:
-            with redirect_stdout(QueueWriter(q)), redirect_stderr(QueueWriter(q)):
+            with redirect_stdout(log), redirect_stderr(log):
                 if mode == "series" and series_url:
                     run_bulk(
-                        session,
+                        SESSION,
                         series_url,
                         series_name=series_name,
                         force=force,
@@ -72,12 +113,8 @@ def _start_async(data):
                     )
                     series_dir = derive_series_name(series_url, series_name)
                     pdf_dir = os.path.join(series_dir, "Chapters")
-                    pdfs = []
-                    if os.path.isdir(pdf_dir):
-                        for f in sorted(os.listdir(pdf_dir)):
-                            if f.lower().endswith(".pdf"):
-                                pdfs.append(os.path.join(pdf_dir, f))
-                    TASKS[task_id]["result"] = {
+                    pdfs = _list_pdfs(pdf_dir)
+                    task["result"] = {
                         "ok": True,
                         "mode": "series",
                         "series_dir": series_dir,
@@ -85,7 +122,7 @@ def _start_async(data):
                     }
                 elif mode == "chapter" and chapter_url:
                     run_single(
-                        session,
+                        SESSION,
                         chapter_url,
                         series_name=series_name,
                         chapter_num=chapter_num,
@@ -97,7 +134,7 @@ def _start_async(data):
                     series_dir = derive_series_name(chapter_url, series_name)
                     lbl = str(chapter_num or chapter_label_from_url(chapter_url) or "custom")
                     pdf_path = chapter_pdf(series_dir, lbl)
-                    TASKS[task_id]["result"] = {
+                    task["result"] = {
                         "ok": True,
                         "mode": "chapter",
                         "series_dir": series_dir,
@@ -105,12 +142,16 @@ def _start_async(data):
                         "pdf": pdf_path if os.path.exists(pdf_path) else None,
                     }
                 else:
-                    TASKS[task_id]["result"] = {"ok": False, "error": "invalid_params"}
+                    task["result"] = {"ok": False, "error": "invalid_params"}
         except Exception as e:
-            TASKS[task_id]["result"] = {"ok": False, "error": str(e)}
+            task["result"] = {"ok": False, "error": str(e)}
         finally:
-            TASKS[task_id]["done"] = True
-            q.put("Task finished\n")
+            log.write("Task finished\n")
+            task["done"] = True
+            # keep the result around long enough for the stream to pick it up
+            expire = threading.Timer(TASK_TTL_SECS, _expire_task, args=[task_id])
+            expire.daemon = True
+            expire.start()
 
     threading.Thread(target=_runner, daemon=True).start()
     return task_id
@@ -122,6 +163,8 @@ def api_start():
     except Exception:
         return jsonify({"ok": False, "error": "invalid_json"}), 400
     task_id = _start_async(data)
+    if task_id is None:
+        return jsonify({"ok": False, "error": "too_many_tasks"}), 429
     return jsonify({"ok": True, "task_id": task_id})
 
 @app.get("/api/stream/<task_id>")
@@ -131,20 +174,35 @@ def api_stream(task_id):
         return Response("", status=404)
 
     def gen():
-        yield "retry: 1500\n\n"
-        q = t["queue"]
+        yield b"retry: 1500\n\n"
+        log = t["log"]
+        # batch log lines into one write instead of flushing every line
+        buf = bytearray()
+        last_flush = time.monotonic()
         while True:
-            try:
-                msg = q.get(timeout=0.5)
+            for msg in log.drain(timeout=0.05):
                 msg = msg.replace("\r", "")
                 for line in msg.splitlines():
-                    yield f"data: {line}\n\n"
-            except queue.Empty:
-                pass
-            if t["done"] and q.empty():
-                yield f"event: end\ndata: {json.dumps(t['result'])}\n\n"
+                    buf += f"data: {line}\n\n".encode()
+            done = t["done"] and log.empty()
+            now = time.monotonic()
+            if buf and (
+                done
+                or len(buf) >= SSE_FLUSH_BYTES
+                or now - last_flush >= SSE_FLUSH_SECS
+            ):
+                yield bytes(buf)
+                buf.clear()
+                last_flush = now
+            if done:
+                yield f"event: end\ndata: {json.dumps(t['result'])}\n\n".encode()
                 break
-    return Response(gen(), mimetype="text/event-stream")
+    return Response(
+        gen(),
+        mimetype="text/event-stream",
+        direct_passthrough=True,
+        headers={"X-Accel-Buffering": "no"},
+    )
 
 @app.get("/")
 def index():
@@ -167,12 +225,10 @@ def api_run():
     max_retries = int(data.get("max_retries", 3))
     verbose = bool(data.get("verbose", False))
 
-    session = make_session()
-
     if mode == "series" and series_url:
         try:
             run_bulk(
-                session,
+                SESSION,
                 series_url,
                 series_name=series_name,
                 force=force,
@@ -182,11 +238,7 @@ def api_run():
             )
             series_dir = derive_series_name(series_url, series_name)
             pdf_dir = os.path.join(series_dir, "Chapters")
-            pdfs = []
-            if os.path.isdir(pdf_dir):
-                for f in sorted(os.listdir(pdf_dir)):
-                    if f.lower().endswith(".pdf"):
-                        pdfs.append(os.path.join(pdf_dir, f))
+            pdfs = _list_pdfs(pdf_dir)
             return jsonify({
                 "ok": True,
                 "mode": "series",
@@ -199,7 +251,7 @@ def api_run():
     if mode == "chapter" and chapter_url:
         try:
             run_single(
-                session,
+                SESSION,
                 chapter_url,
                 series_name=series_name,
                 chapter_num=chapter_num,
@@ -224,6 +276,7 @@ def api_run():
     return jsonify({"ok": False, "error": "invalid_params"}), 400
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     host = "127.0.0.1"
     port = 8000
     print(f"GUI server running at http://{host}:{port}/")